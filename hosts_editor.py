@@ -11,14 +11,42 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, font, filedialog, simpledialog
 import os
+import re
 import ctypes
-import difflib
+import shutil
+try:
+    # Optional Rust drop-in for difflib; several times faster on large inputs
+    from difflib_rs import unified_diff as _unified_diff
+except ImportError:
+    from difflib import unified_diff as _unified_diff
 import subprocess
+import http.client
+import urllib.parse
 import urllib.request
 import urllib.error
+import threading
 import json
 import webbrowser
 import hashlib
+import gzip
+import itertools
+import functools
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+try:
+    # Optional C JSON codec for the config file; both paths produce compact UTF-8 bytes
+    import orjson
+    _json_dumps, _json_loads = orjson.dumps, orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    _json_loads = json.loads
+try:
+    # Optional Brotli decoder; when present downloads also accept br, which CDNs
+    # such as jsDelivr serve noticeably smaller than gzip for plain-text lists
+    import brotli
+except ImportError:
+    brotli = None
 
 # ----------------------------- Theme (Catppuccin Mocha) ----------------------
 PALETTE = {
@@ -41,6 +69,206 @@ PALETTE = {
     "accent": "#b4befe",
 }
 
+# Loopback names/addresses that Clean never emits as block entries
+LOCAL_HOSTNAMES = frozenset(('127.0.0.1', '0.0.0.0', 'localhost'))
+
+# ----------------------------- Line Processing -------------------------------
+@functools.lru_cache(maxsize=1)  # one entry: each holds a full copy of the buffer and its result
+def _clean_lines(lines, sort_entries, group_by_domain):
+    """Clean/standardize a tuple of hosts lines. Memoized on the content so repeated
+    Clean/Save runs over an unchanged buffer skip the scan entirely."""
+    # One pass: a line with no tokens left once its comment is cut off is a blank or
+    # comment-only line and is kept (deduped via a set); otherwise its last token is
+    # the hostname, deduped with an insertion-ordered dict so only unique entries
+    # get the "0.0.0.0 " prefix.
+    preserved_lines = set()
+    preserve = preserved_lines.add
+    hostnames = {}
+    for line in lines:
+        parts = line.partition('#')[0].split()
+        if parts:
+            hostnames[parts[-1].lower()] = None
+        else:
+            preserve(line)
+    final_lines = [f"0.0.0.0 {hostname}" for hostname in hostnames if hostname not in LOCAL_HOSTNAMES]
+
+    # Entries share the "0.0.0.0 " prefix, so a plain sort already orders by hostname;
+    # grouping sorts on reversed labels (com.example.ads) to keep subdomains together.
+    if sort_entries:
+        if group_by_domain:
+            final_lines.sort(key=lambda line: line[8:].split('.')[::-1])
+        else:
+            final_lines.sort()
+
+    return tuple(itertools.chain(sorted(preserved_lines), ("",), final_lines))
+
+def _common_affixes(a, b):
+    """Return (prefix, suffix): how many leading and trailing lines a and b share,
+    with the suffix never overlapping the prefix."""
+    limit = min(len(a), len(b))
+    prefix = 0
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    return prefix, suffix
+
+def _in_suffix_set(hostname, suffixes):
+    """True if any parent domain of hostname is in suffixes, probing one hash lookup
+    per label (ads.cdn.example.com -> cdn.example.com, example.com, com)."""
+    dot = hostname.find('.')
+    while dot != -1:
+        if hostname[dot + 1:] in suffixes:
+            return True
+        dot = hostname.find('.', dot + 1)
+    return False
+
+def _filter_whitelisted(lines, exact, suffixes):
+    """Drop entry lines whose hostname is whitelisted; comments, blanks and single
+    tokens always stay. Pure function over immutable sets, so it can run on a worker."""
+    if not exact and not suffixes:
+        return lines
+    # One comprehension over map(str.split): blank lines and single tokens have
+    # fewer than two parts, comments start with '#', everything else is looked up
+    if not suffixes:
+        return [line for line, parts in zip(lines, map(str.split, lines))
+                if len(parts) < 2 or parts[0][0] == '#' or parts[1].lower() not in exact]
+    kept = []
+    for line, parts in zip(lines, map(str.split, lines)):
+        if len(parts) >= 2 and parts[0][0] != '#':
+            hostname = parts[1].lower()
+            if hostname in exact or _in_suffix_set(hostname, suffixes):
+                continue
+        kept.append(line)
+    return kept
+
+def _parse_block(data):
+    """Decode a downloaded blocklist and drop repeated lines, keeping first-seen order.
+    Runs on a download worker so each list is deduped in parallel with the others."""
+    return list(dict.fromkeys(data.decode('utf-8', errors='ignore').splitlines()))
+
+@functools.lru_cache(maxsize=64)
+def _search_pattern(query):
+    """Case-insensitive literal pattern for query, escaped and compiled once per term."""
+    return re.compile(re.escape(query), re.IGNORECASE)
+
+# --------------------------------- Network -----------------------------------
+# Downloaded blocklists, revalidated with conditional GETs before reuse
+CACHE_DIR = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'), 'HostsEditor', 'cache')
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # don't leave hosts.tmp behind in drivers\etc (full disk, locked or read-only target)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# Idle keep-alive connections reused across imports, keyed by (scheme, host), so
+# several lists from the same host share TLS handshakes
+_connections = {}
+_connections_lock = threading.Lock()
+
+def _proxied_get(url, headers):
+    """GET url through urllib's default opener, which honours HTTP(S)_PROXY and the
+    Windows proxy settings and follows redirects itself. Returns (status, headers, body)."""
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        # 304 and other non-2xx statuses arrive as HTTPError; the caller handles them
+        with e:
+            return e.code, e.headers, e.read()
+
+def _http_get(url, headers, max_redirects=5):
+    """GET url over a pooled keep-alive connection, following redirects.
+    Returns (status, headers, body). Goes through urllib instead when a proxy
+    is configured for the URL, since the direct connections would bypass it."""
+    for _ in range(max_redirects + 1):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parts.hostname or ''):
+            return _proxied_get(url, headers)
+        key = (parts.scheme, parts.netloc)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        for attempt in range(2):
+            # Check an idle connection out of the pool so concurrent downloads never
+            # share one; it goes back once its response has been read
+            with _connections_lock:
+                idle = _connections.get(key)
+                conn = idle.pop() if idle else None
+            if conn is None:
+                conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+                conn = conn_class(parts.netloc, timeout=30)
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # the server may have closed an idle pooled connection; retry once fresh
+                conn.close()
+                if attempt:
+                    raise
+        if response.will_close:
+            conn.close()
+        else:
+            with _connections_lock:
+                _connections.setdefault(key, []).append(conn)
+        location = response.getheader('Location')
+        if response.status in (301, 302, 303, 307, 308) and location:
+            url = urllib.parse.urljoin(url, location)
+            continue
+        return response.status, response.headers, body
+    raise OSError(f"Too many redirects fetching {url}")
+
+def _cached_fetch(url):
+    """Return the body of url as bytes. A cached copy is revalidated with
+    If-None-Match/If-Modified-Since, so an unchanged list costs a 304 round-trip."""
+    body_path = os.path.join(CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest())
+    meta_path = body_path + ".json"
+    headers = {'User-Agent': 'Mozilla/5.0', 'Accept-Encoding': 'br, gzip' if brotli else 'gzip'}
+    try:
+        if os.path.exists(body_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+    except (OSError, ValueError):
+        pass
+
+    status, response_headers, body = _http_get(url, headers)
+    if status == 304:
+        with open(body_path, 'rb') as f:
+            return f.read()
+    if status != 200:
+        raise OSError(f"HTTP Error {status} fetching {url}")
+    encoding = response_headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    elif encoding == 'br' and brotli:
+        body = brotli.decompress(body)
+    etag, last_modified = response_headers.get('ETag'), response_headers.get('Last-Modified')
+
+    if etag or last_modified:
+        # Cache failures only cost a re-download next time
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write_atomic(body_path, body)
+            _write_atomic(meta_path, json.dumps({'etag': etag, 'last_modified': last_modified}).encode('utf-8'))
+        except OSError:
+            pass
+    return body
+
 # ----------------------------- Tooltip Helper --------------------------------
 class ToolTip:
     """Creates a tooltip for a given widget."""
@@ -48,6 +276,7 @@ class ToolTip:
         self.widget = widget
         self.text = text
         self.tooltip_window = None
+        self.label = None
         self.widget.bind("<Enter>", self.show_tooltip)
         self.widget.bind("<Leave>", self.hide_tooltip)
 
@@ -59,33 +288,56 @@ class ToolTip:
         x += self.widget.winfo_rootx() + 25
         y += self.widget.winfo_rooty() + 25
 
-        self.tooltip_window = tk.Toplevel(self.widget)
-        self.tooltip_window.wm_overrideredirect(True)
+        # Created on first hover; later hovers just show and withdraw it
+        if self.tooltip_window is None:
+            self.tooltip_window = tk.Toplevel(self.widget)
+            self.tooltip_window.wm_overrideredirect(True)
+            self.label = tk.Label(
+                self.tooltip_window,
+                text=self.text,
+                justify="left",
+                background=PALETTE["mantle"],
+                foreground=PALETTE["text"],
+                relief="solid",
+                borderwidth=1,
+                font=("Segoe UI", 9),
+            )
+            self.label.pack(ipadx=6, ipady=3)
+        else:
+            self.label.config(text=self.text)
         self.tooltip_window.wm_geometry(f"+{x}+{y}")
-        label = tk.Label(
-            self.tooltip_window,
-            text=self.text,
-            justify="left",
-            background=PALETTE["mantle"],
-            foreground=PALETTE["text"],
-            relief="solid",
-            borderwidth=1,
-            font=("Segoe UI", 9),
-        )
-        label.pack(ipadx=6, ipady=3)
+        self.tooltip_window.deiconify()
 
     def hide_tooltip(self, event=None):
         if self.tooltip_window:
-            self.tooltip_window.destroy()
-        self.tooltip_window = None
+            self.tooltip_window.withdraw()
 
 # ------------------------------ Preview Window --------------------------------
+def _add_hscrollbar(text_widget):
+    """Give an unwrapped ScrolledText a horizontal scrollbar along its bottom edge."""
+    hbar = ttk.Scrollbar(text_widget.frame, orient="horizontal", command=text_widget.xview)
+    # ScrolledText has already packed the text; 'before' keeps the bar from being squeezed out
+    hbar.pack(side=tk.BOTTOM, fill=tk.X, before=text_widget)
+    text_widget.configure(xscrollcommand=hbar.set)
+
 class PreviewWindow(tk.Toplevel):
+    # Above this many lines the preview uses the O(N) set diff
+    DIFF_ALIGN_MAX_LINES = 20000
+    # Unchanged lines kept around each change; longer unchanged runs are folded
+    DIFF_CONTEXT_LINES = 3
+    # Line ranges passed to each tag_add call
+    DIFF_TAG_BATCH = 1000
+    # Preview lines inserted per after_idle step while rendering
+    DIFF_RENDER_LINES = 5000
+
     def __init__(self, parent, original_lines, new_lines, title="Preview Changes", on_apply_callback=None):
         super().__init__(parent.root)
         self.parent_editor = parent
         self.new_lines = new_lines
         self.on_apply_callback = on_apply_callback
+        self._render_job = None
+        # Callbacks keep running under grab_set, so the editor can change while we're open
+        self._buffer_generation = parent._buffer_generation
 
         self.title(title)
         self.geometry("900x650")
@@ -96,10 +348,11 @@ class PreviewWindow(tk.Toplevel):
         text_frame = ttk.Frame(self, padding=(10, 10, 10, 0))
         text_frame.pack(expand=True, fill='both')
         self.preview_text = scrolledtext.ScrolledText(
-            text_frame, wrap=tk.WORD, font=("Consolas", 11),
+            text_frame, wrap=tk.NONE, font=("Consolas", 11),
             bg=PALETTE["crust"], fg=PALETTE["text"], insertbackground=PALETTE["text"],
             selectbackground=PALETTE["blue"], relief="flat"
         )
+        _add_hscrollbar(self.preview_text)
         self.preview_text.pack(expand=True, fill='both')
 
         button_frame = ttk.Frame(self, padding=10)
@@ -115,24 +368,108 @@ class PreviewWindow(tk.Toplevel):
 
         self.preview_text.tag_config('added', foreground="#89D68D")
         self.preview_text.tag_config('removed', foreground=PALETTE["red"])
+        self.preview_text.tag_config('hunk', foreground=PALETTE["overlay1"])
         self.display_diff(original_lines, new_lines)
         self.protocol("WM_DELETE_WINDOW", self.destroy)
 
     def display_diff(self, original, new):
-        diff = difflib.ndiff(original, new)
+        # Identical head/tail lines are plain context; only the changed middle is diffed,
+        # which keeps SequenceMatcher's input (and its worst-case recursion) small.
+        prefix, suffix = _common_affixes(original, new)
+        orig_mid = original[prefix:len(original) - suffix]
+        new_mid = new[prefix:len(new) - suffix]
+
+        if not orig_mid or not new_mid:
+            # Pure append/insert (an import) or pure removal: nothing left to align
+            middle = [('removed', line) for line in orig_mid]
+            middle.extend(('added', line) for line in new_mid)
+        elif len(orig_mid) + len(new_mid) <= self.DIFF_ALIGN_MAX_LINES:
+            middle = self._aligned_diff(orig_mid, new_mid)
+        else:
+            middle = self._set_diff(orig_mid, new_mid)
+        diff = [(None, line) for line in original[:prefix]]
+        diff.extend(middle)
+        diff.extend((None, line) for line in original[len(original) - suffix:])
+
+        # Build the preview lines plus per-tag line ranges, then stream them into the
+        # widget a chunk at a time (see _render_next_chunk). Long unchanged runs are
+        # folded to a few context lines around each change.
+        context = self.DIFF_CONTEXT_LINES
+        out, ranges = [], {'added': [], 'removed': [], 'hunk': []}
+        for tag, run in itertools.groupby(diff, key=lambda item: item[0]):
+            lines = [line for _, line in run]
+            if not tag and len(lines) > 2 * context + 1:
+                out.extend(lines[:context])
+                ranges['hunk'].append((len(out) + 1, len(out) + 2))
+                out.append(f"@@ {len(lines) - 2 * context:,} unchanged lines @@")
+                out.extend(lines[-context:])
+                continue
+            if tag:
+                ranges[tag].append((len(out) + 1, len(out) + 1 + len(lines)))
+            out.extend(lines)
+
+        self._cancel_render()
         self.preview_text.config(state=tk.NORMAL)
         self.preview_text.delete('1.0', tk.END)
-        for line in diff:
-            line_content = line[2:] + '\n'
-            if line.startswith('+ '):
-                self.preview_text.insert(tk.END, line_content, 'added')
-            elif line.startswith('- '):
-                self.preview_text.insert(tk.END, line_content, 'removed')
-            elif not line.startswith('? '):
-                self.preview_text.insert(tk.END, line_content)
         self.preview_text.config(state=tk.DISABLED)
+        self._render_next_chunk(out, ranges, 0)
+
+    def _render_next_chunk(self, out, ranges, start):
+        """Insert the next DIFF_RENDER_LINES preview lines with one insert and a few
+        batched tag_add calls, then reschedule from after_idle so the window paints
+        and Cancel stays clickable while a large diff renders."""
+        self._render_job = None
+        end = min(start + self.DIFF_RENDER_LINES, len(out))
+        self.preview_text.config(state=tk.NORMAL)
+        self.preview_text.insert(tk.END, ''.join(line + '\n' for line in out[start:end]))
+        # Spans are 1-based [first, last) line ranges; clip them to this chunk
+        first, last = start + 1, end + 1
+        batch = self.DIFF_TAG_BATCH
+        for tag, spans in ranges.items():
+            indices = [f"{line}.0" for lo, hi in spans if lo < last and hi > first
+                       for line in (max(lo, first), min(hi, last))]
+            for i in range(0, len(indices), 2 * batch):
+                self.preview_text.tag_add(tag, *indices[i:i + 2 * batch])
+        self.preview_text.config(state=tk.DISABLED)
+        if end < len(out):
+            self.parent_editor.update_status(f"Rendering preview... ({end * 100 // len(out)}%)")
+            self._render_job = self.after_idle(self._render_next_chunk, out, ranges, end)
+        elif start:
+            self.parent_editor.update_status("Preview ready.")
+
+    def _cancel_render(self):
+        if self._render_job:
+            self.after_cancel(self._render_job)
+            self._render_job = None
+
+    def destroy(self):
+        self._cancel_render()
+        super().destroy()
+
+    def _set_diff(self, original, new):
+        # Hosts files are unordered blocklists, so added/removed classification via
+        # set membership is enough - no O(N*M) alignment like difflib.ndiff.
+        orig_set, new_set = set(original), set(new)
+        diff = [('removed' if line not in new_set else None, line) for line in original]
+        diff.extend(('added', line) for line in new if line not in orig_set)
+        return diff
+
+    def _aligned_diff(self, original, new):
+        # Full-file context so the preview shows every line
+        context = max(len(original), len(new))
+        tags = {'+': 'added', '-': 'removed', ' ': None}
+        diff_lines = _unified_diff(original, new, n=context, lineterm='')
+        # skip the ---/+++ file header; content lines never start with '@'
+        return [(tags[line[0]], line[1:]) for line in itertools.islice(diff_lines, 2, None) if line[:1] != '@']
 
     def apply_changes(self):
+        if self.parent_editor._buffer_generation != self._buffer_generation:
+            messagebox.showwarning("Editor Changed", "The editor changed while this preview was open "
+                                   "(an edit or a finished import).\nRun the operation again to include it.",
+                                   parent=self)
+            self.parent_editor.update_status(f"'{self.title()}' not applied; the editor changed.", is_error=True)
+            self.destroy()
+            return
         if self.on_apply_callback:
             self.on_apply_callback(self.new_lines)
         else:
@@ -168,6 +505,22 @@ class AddSourceDialog(simpledialog.Dialog):
 class HostsFileEditor:
     HOSTS_FILE_PATH = r"C:\Windows\System32\drivers\etc\hosts"
     CONFIG_FILE = "hosts_editor_config.json"
+    INSERT_CHUNK_CHARS = 1 << 18
+    SEARCH_TAG_BATCH = 1000
+    # Quiet period after the last keystroke before the buffer is hashed for the Save button
+    SAVE_STATE_DELAY_MS = 200
+    # Custom source buttons created per idle tick at startup
+    CUSTOM_SOURCE_BATCH = 5
+    # Built-in downloadable lists, by the source name used in their import header
+    BLOCKLIST_URLS = {
+        "HOSTShield": "https://raw.githubusercontent.com/SysAdminDoc/HOSTShield/refs/heads/main/HOSTS.txt",
+        "StevenBlack": "https://raw.githubusercontent.com/StevenBlack/hosts/refs/heads/master/hosts",
+        "HaGezi Ultimate": "https://cdn.jsdelivr.net/gh/hagezi/dns-blocklists@latest/hosts/ultimate.txt",
+        "AdAway": "https://adaway.org/hosts.txt",
+        "Adobe Blocklist": "https://raw.githubusercontent.com/SysAdminDoc/HOSTShield/refs/heads/main/AdobeHosts.txt",
+        "Microsoft Blocklist": "https://raw.githubusercontent.com/SysAdminDoc/HOSTShield/refs/heads/main/Microsoft.txt",
+    }
+    IMPORT_HEADER = "# --- Imported from {} ---"
 
     def __init__(self, root):
         self.root = root
@@ -179,10 +532,34 @@ class HostsFileEditor:
         self.default_font = font.Font(family="Segoe UI", size=10)
         self.title_font = font.Font(family="Segoe UI", size=11, weight="bold")
         self.custom_sources = []
+        self._custom_source_names = set()
+        # Buttons exist for custom_sources[:_custom_buttons]; the rest are created from idle
+        self._custom_buttons = 0
+        self._custom_sources_job = None
+        self._whitelist_cache = (None, (frozenset(), frozenset()))
+        self._last_config_json = None
 
         # Tracks whether current editor content equals last applied content
         self._last_applied_hash = None
         self._suppress_modified_handler = False
+        self._save_state_job = None
+        self._save_button_style = "Action.TButton"
+
+        # Authoritative line model; re-read from the widget only after user edits
+        self._lines = []
+        self._lines_stale = False
+        # Bumped on every buffer change; async results compare it against their snapshot
+        self._buffer_generation = 0
+        self._load_job = None
+        self._flush_proc = None
+        self._status_restore_job = None
+        self._processing = False
+        self._is_admin = False
+        # Disk I/O and heavy line processing run here, off the Tk thread. One worker
+        # keeps jobs in submission order (a save always lands before a reload).
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        # Downloads are independent of each other and of disk order, so they get their own
+        self._net_pool = ThreadPoolExecutor(max_workers=4)
 
         self._init_styles()
         self._init_menubar()
@@ -252,6 +629,9 @@ class HostsFileEditor:
         self._btn(web_import_frame, "StevenBlack", self.import_stevenblack, "Append StevenBlack unified blocklist.").pack(fill="x", pady=2)
         self._btn(web_import_frame, "HaGezi Ultimate", self.import_hagezi, "Append HaGezi Ultimate DNS blocklist.").pack(fill="x", pady=2)
         self._btn(web_import_frame, "AdAway", self.import_adaway, "Append AdAway mobile ad blocklist.").pack(fill="x", pady=2)
+        self._btn(web_import_frame, "Refresh Imported Lists", self.refresh_imported_sources,
+                  "Re-download every list already imported here, in parallel, and append new entries.",
+                  style="Accent.TButton").pack(fill="x", pady=(6, 2))
 
         specific_import_frame = ttk.LabelFrame(import_frame, text="Specific Blacklists")
         specific_import_frame.pack(fill="x", padx=8, pady=4)
@@ -272,6 +652,16 @@ class HostsFileEditor:
         self._btn(util_row, "Clean", self.auto_clean, "Clean and format hosts file.").pack(side="left", expand=True, fill="x", padx=(0, 6))
         self._btn(util_row, "Deduplicate", self.deduplicate, "Remove duplicate entries.").pack(side="left", expand=True, fill="x", padx=6)
         self._btn(util_row, "Flush DNS", self.flush_dns, "Flush Windows DNS cache.", style="Accent.TButton").pack(side="left", expand=True, fill="x", padx=(6, 0))
+        sort_row = ttk.Frame(utilities_frame)
+        sort_row.pack(fill="x", padx=8, pady=(0, 8))
+        self.sort_entries_var = tk.BooleanVar(value=True)
+        self.group_by_domain_var = tk.BooleanVar(value=False)
+        sort_check = ttk.Checkbutton(sort_row, text="Sort entries", variable=self.sort_entries_var)
+        sort_check.pack(side="left")
+        ToolTip(sort_check, "Sort cleaned entries. Uncheck to keep original order.")
+        group_check = ttk.Checkbutton(sort_row, text="Group by domain", variable=self.group_by_domain_var)
+        group_check.pack(side="left", padx=(12, 0))
+        ToolTip(group_check, "Sort by reversed domain labels so subdomains stay together.")
 
         # Whitelist
         whitelist_frame = ttk.LabelFrame(self.sidebar_inner, text="Persistent Whitelist (Auto-Applied)")
@@ -291,12 +681,15 @@ class HostsFileEditor:
         editor_panel = ttk.Frame(right_area)
         editor_panel.pack(fill="both", expand=True)
 
+        # Undo stays off: Tk would otherwise record every bulk load/import insert
         self.text_area = scrolledtext.ScrolledText(
-            editor_panel, wrap=tk.WORD, font=("Consolas", 12),
+            editor_panel, wrap=tk.NONE, undo=False, maxundo=0, autoseparators=False, font=("Consolas", 12),
             bg=PALETTE["crust"], fg=PALETTE["text"], insertbackground=PALETTE["text"],
             selectbackground=PALETTE["blue"], relief="flat"
         )
+        _add_hscrollbar(self.text_area)
         self.text_area.pack(expand=True, fill='both')
+        self._install_edit_tracker()
 
         # Status bar
         status_frame = ttk.Frame(root, padding=(10, 6, 10, 10))
@@ -304,9 +697,14 @@ class HostsFileEditor:
         self.status_label = ttk.Label(status_frame, text="Loading...", font=self.default_font, foreground=PALETTE["subtext"])
         self.status_label.pack(side=tk.LEFT)
 
-        # Search highlighting setup
-        self._search_matches = []
+        # Search highlighting setup; match starts are kept as parallel (line, column) int arrays
+        self._search_matches = array('i')
+        self._search_cols = array('i')
+        self._search_len = 0
         self._search_index = -1
+        # Query and line list the current matches came from, for prefix narrowing
+        self._last_query = ""
+        self._search_source = (None, 0)
         self.text_area.tag_configure("search_match", background=PALETTE["blue"], foreground=PALETTE["crust"])
         self.text_area.tag_configure("search_current", background=PALETTE["green"], foreground=PALETTE["crust"])
 
@@ -330,6 +728,9 @@ class HostsFileEditor:
         style.configure("TSeparator", background=PALETTE["surface0"])
         style.configure("TLabelFrame", background=PALETTE["mantle"], foreground=PALETTE["text"], borderwidth=0, relief="flat")
         style.configure("TLabelframe.Label", background=PALETTE["mantle"], foreground=PALETTE["text"], font=self.title_font)
+        style.configure("TCheckbutton", background=PALETTE["base"], foreground=PALETTE["text"],
+                        indicatorbackground=PALETTE["crust"], indicatorforeground=PALETTE["text"])
+        style.map("TCheckbutton", background=[("active", PALETTE["base"])])
         style.configure("TEntry", fieldbackground=PALETTE["crust"], foreground=PALETTE["text"])
         style.map("TEntry",
                   fieldbackground=[("focus", PALETTE["crust"])],
@@ -384,12 +785,10 @@ class HostsFileEditor:
         self.root.option_add('*Menu.activeForeground', "#0b1020")
 
     def _init_menubar(self):
-        menu_bar = tk.Menu(self.root, tearoff=0, bg=PALETTE["mantle"], fg=PALETTE["text"],
-                           activebackground=PALETTE["blue"], activeforeground="#0b1020")
+        menu_bar = tk.Menu(self.root, tearoff=0)
         self.root.config(menu=menu_bar)
 
-        file_menu = tk.Menu(menu_bar, tearoff=0, bg=PALETTE["mantle"], fg=PALETTE["text"],
-                            activebackground=PALETTE["blue"], activeforeground="#0b1020")
+        file_menu = tk.Menu(menu_bar, tearoff=0)
         file_menu.add_command(label="Save Changes", command=self.save_file)
         file_menu.add_command(label="Refresh", command=self.load_file)
         file_menu.add_command(label="Revert to Backup", command=self.revert_to_backup)
@@ -397,15 +796,13 @@ class HostsFileEditor:
         file_menu.add_command(label="Exit", command=self.root.destroy)
         menu_bar.add_cascade(label="File", menu=file_menu)
 
-        tools_menu = tk.Menu(menu_bar, tearoff=0, bg=PALETTE["mantle"], fg=PALETTE["text"],
-                             activebackground=PALETTE["blue"], activeforeground="#0b1020")
+        tools_menu = tk.Menu(menu_bar, tearoff=0)
         tools_menu.add_command(label="Clean", command=self.auto_clean)
         tools_menu.add_command(label="Deduplicate", command=self.deduplicate)
         tools_menu.add_command(label="Flush DNS", command=self.flush_dns)
         menu_bar.add_cascade(label="Tools", menu=tools_menu)
 
-        help_menu = tk.Menu(menu_bar, tearoff=0, bg=PALETTE["mantle"], fg=PALETTE["text"],
-                            activebackground=PALETTE["blue"], activeforeground="#0b1020")
+        help_menu = tk.Menu(menu_bar, tearoff=0)
         help_menu.add_command(label="About", command=lambda: messagebox.showinfo(
             "About",
             "Hosts File Management Tool v2.7\nCatppuccin Mocha theme, smart buttons, and modern UX.\nCreated by Steve. Enhanced by ChatGPT."
@@ -422,20 +819,30 @@ class HostsFileEditor:
     def update_status(self, message, is_error=False):
         color = PALETTE["red"] if is_error else PALETTE["subtext"]
         self.status_label.config(text=message, foreground=color)
-        # fade back to neutral after delay
-        self.root.after(4000, lambda: self.status_label.config(foreground=PALETTE["subtext"]))
+        # fade back to neutral after delay; only the latest message's restore stays queued
+        if self._status_restore_job:
+            self.root.after_cancel(self._status_restore_job)
+        self._status_restore_job = self.root.after(4000, self._restore_status_color)
+
+    def _restore_status_color(self):
+        self._status_restore_job = None
+        self.status_label.config(foreground=PALETTE["subtext"])
 
     def on_closing(self):
         self.save_config()
+        # Drop queued downloads so they don't keep the process alive after the window
+        # closes; _pool is left to drain, since it may still hold a hosts-file write
+        self._net_pool.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
 
     # --------------------------- Admin Check ----------------------------------
     def check_admin_privileges(self):
-        try:
-            is_admin = (os.getuid() == 0)
-        except AttributeError:
-            is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
-        if not is_admin:
+        # Queried once at startup; saves reuse the cached answer
+        if os.name == 'nt':
+            self._is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
+        else:
+            self._is_admin = os.geteuid() == 0
+        if not self._is_admin:
             self.update_status("Warning: Not running as Administrator. You cannot save.", is_error=True)
             messagebox.showwarning("Admin Rights Required", "Run as Administrator to save changes.")
 
@@ -443,13 +850,17 @@ class HostsFileEditor:
     def load_config(self):
         try:
             if os.path.exists(self.CONFIG_FILE):
-                with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                with open(self.CONFIG_FILE, 'rb') as f:
+                    config = _json_loads(f.read())
+                self._last_config_json = _json_dumps(config)
                 self.whitelist_text_area.delete('1.0', tk.END)
                 self.whitelist_text_area.insert('1.0', config.get("whitelist", ""))
                 self.custom_sources = config.get("custom_sources", [])
-                for source in self.custom_sources:
-                    self._create_custom_source_button(source['name'], source['url'])
+                self._custom_source_names = {source['name'] for source in self.custom_sources}
+                self.sort_entries_var.set(config.get("sort_entries", True))
+                self.group_by_domain_var.set(config.get("group_by_domain", False))
+                if not self._custom_sources_job:
+                    self._custom_sources_job = self.root.after_idle(self._populate_custom_sources)
                 self.update_status("Configuration loaded.")
         except Exception as e:
             self.update_status(f"Could not load config: {e}", is_error=True)
@@ -457,29 +868,161 @@ class HostsFileEditor:
     def save_config(self):
         config = {
             "whitelist": self.whitelist_text_area.get('1.0', tk.END).strip(),
-            "custom_sources": self.custom_sources
+            "custom_sources": self.custom_sources,
+            "sort_entries": self.sort_entries_var.get(),
+            "group_by_domain": self.group_by_domain_var.get()
         }
+        # Compact dump, and no disk write at all when nothing changed since load/save
+        config_json = _json_dumps(config)
+        if config_json == self._last_config_json:
+            return
         try:
-            with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4)
+            _write_atomic(self.CONFIG_FILE, config_json)
+            self._last_config_json = config_json
         except IOError as e:
             print(f"Error saving config: {e}")
 
     # ----------------------------- File Ops -----------------------------------
     def get_lines(self):
-        return self.text_area.get('1.0', tk.END).splitlines()
+        self._sync_lines()
+        return list(self._lines)
+
+    def _sync_lines(self):
+        # User edits are applied to self._lines as they happen (see _tracked_text_call);
+        # only an edit the tracker could not follow forces a full copy out of Tk
+        if self._lines_stale:
+            self._lines = self.text_area.get('1.0', tk.END).splitlines()
+            self._lines_stale = False
+
+    def _install_edit_tracker(self):
+        """Put _tracked_text_call in front of the editor's Tcl widget command (the same
+        trick as idlelib's WidgetRedirector), so every insert/delete from Tk's own key,
+        cut and paste bindings passes through Python with its indices."""
+        widget = self.text_area._w
+        self._text_orig_cmd = widget + "_orig"
+        self.root.tk.call("rename", widget, self._text_orig_cmd)
+        self.root.tk.createcommand(widget, self._tracked_text_call)
+
+    def _text_raw(self, *args):
+        # Programmatic bulk edits go straight to Tk; their callers set self._lines themselves
+        return self.root.tk.call(self._text_orig_cmd, *args)
+
+    def _text_line(self, index):
+        return int(str(self._text_raw('index', index)).partition('.')[0])
+
+    def _tracked_text_call(self, op, *args):
+        """Widget command entry point. Registered with a bare createcommand, so a
+        TclError escaping here would be re-raised by mainloop() even when a Tk binding
+        wrapped the call in `catch` (e.g. Copy/Cut/Paste with no selection); swallow it
+        as WidgetRedirector.dispatch does."""
+        try:
+            return self._replay_edit(op, *args)
+        except tk.TclError:
+            return ""
+
+    def _replay_edit(self, op, *args):
+        """Replay a user edit onto self._lines by re-reading just the lines it touched."""
+        if op not in ('insert', 'delete', 'replace') or not args:
+            return self._text_raw(op, *args)
+        self._buffer_generation += 1
+        if self._lines_stale or self._load_job:
+            return self._text_raw(op, *args)
+        # A bad index raises here before anything is edited, leaving the model valid
+        before = self._text_line('end-1c')
+        # An edit never reaches past the last line (Tk keeps its final newline)
+        first = min(self._text_line(args[0]), before)
+        if op == 'insert':
+            last = first
+        elif len(args) == 1:
+            # single-character delete; it may be the newline joining two lines
+            last = self._text_line(f"{args[0]}+1c")
+        elif op == 'replace' or len(args) == 2:
+            last = self._text_line(args[1])
+        else:
+            last = None  # multi-range delete
+        if last is None:
+            self._lines_stale = True
+            return self._text_raw(op, *args)
+
+        result = self._text_raw(op, *args)
+        after = self._text_line('end-1c')
+        last = min(max(last, first), before)
+        changed = str(self._text_raw('get', f"{first}.0", f"{last + after - before}.end"))
+        self._lines[first - 1:last] = changed.split('\n')
+        # the list object survives the edit, so search must not narrow from old hits
+        self._search_source = (None, 0)
+        if len(self._lines) != after:
+            # model and widget disagree (e.g. pasted text with a \u2028 that splitlines()
+            # would split); fall back to a full re-read
+            self._lines_stale = True
+        return result
+
+    def append_lines(self, new_lines):
+        """Append lines to the end of the editor with one insert of just the new text."""
+        if self._load_job:
+            self.set_text(self.get_lines() + list(new_lines))
+            return
+        self._sync_lines()
+        text = '\n'.join(new_lines)
+        if self._lines:
+            text = '\n' + text
+        self._lines.extend(new_lines)
+        self._buffer_generation += 1
+        self._suppress_modified_handler = True
+        self._text_raw('insert', 'end-1c', text)
+        self.text_area.edit_modified(False)
+        self.root.after_idle(self._end_bulk_update)
+        self._update_save_button_state_for_current_text()
 
     def set_text(self, lines):
-        # avoid triggering modified handler during programmatic updates
+        # Small buffers go in with one insert; larger ones are fed in ~256 KB slices,
+        # the first synchronously and the rest from after_idle (see _load_lines_incrementally)
+        if not self._replace_changed_lines(lines):
+            self._load_lines_incrementally(lines)
+
+    def _replace_changed_lines(self, lines):
+        """Swap only the lines between the common head and tail of the current and new
+        content (an applied import, filter or small edit), leaving the rest of the
+        widget and its layout untouched. Returns False when a full reload is cheaper."""
+        if self._load_job:
+            return False
+        self._sync_lines()
+        old = self._lines
+        prefix, suffix = _common_affixes(old, lines)
+        if not prefix and not suffix:
+            return False
+        new_mid = lines[prefix:len(lines) - suffix]
+        if sum(map(len, new_mid)) + len(new_mid) > self.INSERT_CHUNK_CHARS:
+            return False
+
         self._suppress_modified_handler = True
-        self.text_area.delete('1.0', tk.END)
-        self.text_area.insert(tk.END, '\n'.join(lines))
+        self.text_area.config(state=tk.NORMAL)
+        if suffix:
+            # Every middle line is followed by a kept line, so each carries its own newline
+            first = f"{prefix + 1}.0"
+            self._text_raw('delete', first, f"{len(old) - suffix + 1}.0")
+            self._text_raw('insert', first, ''.join(line + '\n' for line in new_mid))
+        else:
+            # Middle runs to the end of the buffer; it hangs off the last kept line
+            self._text_raw('delete', f"{prefix}.end", 'end-1c')
+            self._text_raw('insert', f"{prefix}.end", ''.join('\n' + line for line in new_mid))
+        self._lines = list(lines)
+        self._lines_stale = False
+        self._buffer_generation += 1
         self.text_area.edit_modified(False)
-        self._suppress_modified_handler = False
+        self.root.after_idle(self._end_bulk_update)
         self._update_save_button_state_for_current_text()
+        return True
+
+    def _end_bulk_update(self):
+        self._suppress_modified_handler = False
+        # pick up any user edit that arrived while the handler was suppressed
+        self._on_text_modified()
 
     def _hash_lines(self, lines):
-        return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+        # Line count first: _update_save_button_state_for_current_text rejects on a
+        # changed count without hashing the buffer at all
+        return len(lines), hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
 
     def _set_applied_hash_now(self):
         self._last_applied_hash = self._hash_lines(self.get_lines())
@@ -489,78 +1032,197 @@ class HostsFileEditor:
             return
         if self.text_area.edit_modified():
             self.text_area.edit_modified(False)
-            self._update_save_button_state_for_current_text()
+            # Any edit makes the buffer unapplied right away; the full re-read and hash
+            # that can flip it back (edit undone by hand) waits for a pause in typing
+            self._set_save_button_style("Action.TButton")
+            if self._save_state_job:
+                self.root.after_cancel(self._save_state_job)
+            self._save_state_job = self.root.after(self.SAVE_STATE_DELAY_MS,
+                                                   self._update_save_button_state_for_current_text)
 
     def _update_save_button_state_for_current_text(self):
-        current = self._hash_lines(self.get_lines())
-        if self._last_applied_hash is not None and current == self._last_applied_hash:
+        self._save_state_job = None
+        applied = self._last_applied_hash
+        self._sync_lines()
+        if (applied is not None and len(self._lines) == applied[0]
+                and self._hash_lines(self._lines) == applied):
             # content matches applied version -> show applied state (red, sunken)
-            self.btn_save.configure(style="ActionApplied.TButton")
+            self._set_save_button_style("ActionApplied.TButton")
         else:
             # changes not applied -> show actionable (green)
-            self.btn_save.configure(style="Action.TButton")
-
-    def load_file(self, is_initial_load=False):
+            self._set_save_button_style("Action.TButton")
+
+    def _set_save_button_style(self, style):
+        # Restyling a ttk button relayouts and redraws it; skip it when nothing changes,
+        # which is every keystroke after the first in a burst of typing
+        if style != self._save_button_style:
+            self._save_button_style = style
+            self.btn_save.configure(style=style)
+
+    def _run_in_background(self, work, on_done, on_error, pool=None):
+        """Run work() on the worker pool and hand its result to on_done (or the
+        exception to on_error) back on the Tk thread, polled via root.after."""
+        future = (pool or self._pool).submit(work)
+        self.root.after(30, self._poll_future, future, on_done, on_error)
+
+    def _poll_future(self, future, on_done, on_error):
+        if not future.done():
+            self.root.after(30, self._poll_future, future, on_done, on_error)
+            return
         try:
-            if os.path.exists(self.HOSTS_FILE_PATH):
-                with open(self.HOSTS_FILE_PATH, 'r', encoding='utf-8') as f:
-                    lines = f.read().splitlines()
-                self.set_text(lines)
-                # On initial load, treat current file as "applied"
-                if is_initial_load:
-                    self._last_applied_hash = self._hash_lines(lines)
-                self._update_save_button_state_for_current_text()
-                self.update_status(f"Loaded '{self.HOSTS_FILE_PATH}'")
-            else:
-                self.update_status("Hosts file not found.", is_error=True)
+            result = future.result()
         except Exception as e:
+            on_error(e)
+            return
+        on_done(result)
+
+    def _write_hosts_atomic(self, content):
+        # Encode once (line endings stay platform-native) and swap the file in
+        # atomically, so a failed write never leaves a truncated hosts file behind.
+        data = (content.replace('\n', os.linesep) if os.linesep != '\n' else content).encode('utf-8')
+        _write_atomic(self.HOSTS_FILE_PATH, data)
+
+    def load_file(self, is_initial_load=False):
+        if not os.path.exists(self.HOSTS_FILE_PATH):
+            self.update_status("Hosts file not found.", is_error=True)
+            return
+
+        def read():
+            with open(self.HOSTS_FILE_PATH, 'rb') as f:
+                return f.read().decode('utf-8').splitlines()
+
+        def loaded(lines):
+            # On initial load, treat current file as "applied" (set first so
+            # set_text's button update is the only other hash of the buffer)
+            if is_initial_load:
+                self._last_applied_hash = self._hash_lines(lines)
+            self._load_lines_incrementally(lines, done_message=f"Loaded '{self.HOSTS_FILE_PATH}'")
+
+        def failed(e):
             self.update_status(f"Error loading file: {e}", is_error=True)
             messagebox.showerror("Error", f"Error loading file:\n{e}")
 
+        self.update_status("Loading...")
+        self._run_in_background(read, loaded, failed)
+
+    def _load_lines_incrementally(self, lines, done_message=None):
+        """Fill the editor in chunks from after_idle so the window paints and stays
+        responsive while a large hosts file is inserted."""
+        self._cancel_pending_load()
+        self._lines = list(lines)
+        self._lines_stale = False
+        self._buffer_generation += 1
+        # avoid triggering modified handler during programmatic updates; <<Modified>> is
+        # queued by Tk, so stay suppressed until the queue has drained (see _end_bulk_update)
+        self._suppress_modified_handler = True
+        self.text_area.config(state=tk.NORMAL)
+        self._text_raw('delete', '1.0', tk.END)
+        text = '\n'.join(lines)
+        self._load_next_chunk(self._iter_text_chunks(text), len(text), done_message)
+
+    def _iter_text_chunks(self, text):
+        """Yield (end_offset, slice) pieces of text cut on newline boundaries, large
+        enough that the per-call Tcl overhead is negligible. Slices are produced lazily
+        so only one is alive next to the joined text at a time."""
+        step, start = self.INSERT_CHUNK_CHARS, 0
+        while start < len(text):
+            end = text.find('\n', start + step)
+            end = len(text) if end == -1 else end
+            yield end, text[start:end]
+            start = end
+
+    def _cancel_pending_load(self):
+        if self._load_job:
+            self.root.after_cancel(self._load_job)
+            self._load_job = None
+            self.text_area.config(state=tk.NORMAL)
+
+    def _load_next_chunk(self, chunks, total, done_message):
+        self._load_job = None
+        offset, chunk = next(chunks, (None, None))
+        if chunk is None:
+            self.text_area.config(state=tk.NORMAL)
+            self.text_area.edit_modified(False)
+            self.root.after_idle(self._end_bulk_update)
+            self._update_save_button_state_for_current_text()
+            if done_message:
+                self.update_status(done_message)
+            return
+        # keep the user from typing into a half-loaded buffer
+        self.text_area.config(state=tk.NORMAL)
+        self._text_raw('insert', tk.END, chunk)
+        self.text_area.config(state=tk.DISABLED)
+        self.text_area.edit_modified(False)
+        if done_message and offset < total:
+            self.update_status(f"Loading... ({offset * 100 // total}%)")
+        self._load_job = self.root.after_idle(self._load_next_chunk, chunks, total, done_message)
+
     def save_file(self):
         original_lines = self.get_lines()
         whitelisted_lines = self._get_filtered_lines_by_whitelist(original_lines)
         final_lines = self._get_cleaned_lines(whitelisted_lines)
 
+        def mark_applied():
+            # Hash the snapshot the save was built from, not the editor: an import may
+            # have landed since, and that content isn't in the file
+            self._last_applied_hash = self._hash_lines(original_lines)
+            self._update_save_button_state_for_current_text()
+
         if original_lines != final_lines:
             def proceed_with_save(approved_lines):
-                self._execute_save('\n'.join(approved_lines))
-                num_removed = len(original_lines) - len(whitelisted_lines)
-                self.update_status(f"{num_removed} entries removed by whitelist. File cleaned and saved.")
-                # mark applied and update button style
-                self._set_applied_hash_now()
-                self._update_save_button_state_for_current_text()
+                def saved():
+                    num_removed = len(original_lines) - len(whitelisted_lines)
+                    self.update_status(f"{num_removed} entries removed by whitelist. File cleaned and saved.")
+                    # mark applied and update button style
+                    mark_applied()
+                self._execute_save('\n'.join(approved_lines), on_saved=saved)
             PreviewWindow(self, original_lines, final_lines, title="Preview: Final Changes (Cleaned & Whitelisted)", on_apply_callback=proceed_with_save)
         else:
-            self._execute_save('\n'.join(original_lines))
-            self._set_applied_hash_now()
-            self._update_save_button_state_for_current_text()
+            self._execute_save('\n'.join(original_lines), on_saved=mark_applied)
 
-    def _execute_save(self, content_to_save):
+    def _execute_save(self, content_to_save, on_saved=None):
         if not content_to_save.strip():
             if not messagebox.askyesno("Confirm Empty Save", "Content is empty. Clear hosts file?"):
                 return
 
+        if not self._is_admin:
+            # Known to fail; don't touch the filesystem just to get the PermissionError
+            self.update_status("Save failed: Permission denied.", is_error=True)
+            messagebox.showerror("Error", "Permission denied. Run as Administrator.")
+            return
+
         backup_path = self.HOSTS_FILE_PATH + ".bak"
-        # Create/update backup
-        try:
-            if os.path.exists(self.HOSTS_FILE_PATH):
-                with open(self.HOSTS_FILE_PATH, 'r', encoding='utf-8') as f_in, open(backup_path, 'w', encoding='utf-8') as f_out:
-                    f_out.write(f_in.read())
-        except Exception as e:
-            if not messagebox.askyesno("Backup Failed", f"Could not create backup.\nError: {e}\n\nSave anyway?"):
-                return
 
-        try:
-            with open(self.HOSTS_FILE_PATH, 'w', encoding='utf-8') as f:
-                f.write(content_to_save)
+        def write(make_backup):
+            # Create/update backup; a backup failure is returned, not raised, so the
+            # user can still choose to save without one
+            if make_backup and os.path.exists(self.HOSTS_FILE_PATH):
+                try:
+                    shutil.copyfile(self.HOSTS_FILE_PATH, backup_path)
+                except Exception as e:
+                    return e
+            self._write_hosts_atomic(content_to_save)
+            return None
+
+        def done(backup_error):
+            if backup_error is not None:
+                if messagebox.askyesno("Backup Failed", f"Could not create backup.\nError: {backup_error}\n\nSave anyway?"):
+                    self._run_in_background(lambda: write(False), done, failed)
+                return
             self.update_status(f"Saved successfully. Backup created: '{backup_path}'")
             messagebox.showinfo("Success", "Hosts file saved successfully!")
-        except PermissionError:
-            self.update_status("Save failed: Permission denied.", is_error=True)
-            messagebox.showerror("Error", "Permission denied. Run as Administrator.")
-        except Exception as e:
-            self.update_status(f"Save error: {e}", is_error=True)
+            if on_saved:
+                on_saved()
+
+        def failed(e):
+            if isinstance(e, PermissionError):
+                self.update_status("Save failed: Permission denied.", is_error=True)
+                messagebox.showerror("Error", "Permission denied. Run as Administrator.")
+            else:
+                self.update_status(f"Save error: {e}", is_error=True)
+
+        self.update_status("Saving...")
+        self._run_in_background(lambda: write(True), done, failed)
 
     # ----------------------- Revert to Backup (Preview + Apply) ----------------
     def revert_to_backup(self):
@@ -569,70 +1231,120 @@ class HostsFileEditor:
             messagebox.showinfo("Revert to Backup", "No backup file found. Save once to create a backup.")
             return
 
-        try:
-            with open(self.HOSTS_FILE_PATH, 'r', encoding='utf-8') as current_f:
-                current_lines = current_f.read().splitlines()
-        except Exception as e:
-            self.update_status(f"Error reading current hosts: {e}", is_error=True)
-            messagebox.showerror("Error", f"Error reading current hosts:\n{e}")
-            return
+        def read_both():
+            try:
+                with open(self.HOSTS_FILE_PATH, 'rb') as current_f:
+                    current_data = current_f.read()
+            except Exception as e:
+                raise OSError(f"Error reading current hosts: {e}") from e
+            try:
+                with open(backup_path, 'rb') as bak_f:
+                    backup_data = bak_f.read()
+            except Exception as e:
+                raise OSError(f"Error reading backup: {e}") from e
+            # Byte-identical files (e.g. Revert pressed twice) need no decode or diff
+            if current_data == backup_data:
+                return None
+            try:
+                return current_data.decode('utf-8').splitlines(), backup_data.decode('utf-8').splitlines()
+            except UnicodeDecodeError as e:
+                raise OSError(f"Error reading hosts files: {e}") from e
 
-        try:
-            with open(backup_path, 'r', encoding='utf-8') as bak_f:
-                backup_lines = bak_f.read().splitlines()
-        except Exception as e:
-            self.update_status(f"Error reading backup: {e}", is_error=True)
-            messagebox.showerror("Error", f"Error reading backup:\n{e}")
-            return
+        def read_failed(e):
+            self.update_status(str(e), is_error=True)
+            messagebox.showerror("Error", str(e))
 
         def do_restore(approved_lines):
-            try:
-                with open(self.HOSTS_FILE_PATH, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(approved_lines))
+            def restored(_):
                 self.set_text(approved_lines)
                 self._set_applied_hash_now()
                 self._update_save_button_state_for_current_text()
                 self.update_status("Backup restored successfully.")
                 messagebox.showinfo("Restored", "Hosts file restored from backup.")
-            except PermissionError:
-                self.update_status("Restore failed: Permission denied.", is_error=True)
-                messagebox.showerror("Error", "Permission denied. Run as Administrator.")
-            except Exception as e:
-                self.update_status(f"Restore error: {e}", is_error=True)
 
-        PreviewWindow(self, current_lines, backup_lines, title="Preview: Restore from Backup", on_apply_callback=do_restore)
+            def restore_failed(e):
+                if isinstance(e, PermissionError):
+                    self.update_status("Restore failed: Permission denied.", is_error=True)
+                    messagebox.showerror("Error", "Permission denied. Run as Administrator.")
+                else:
+                    self.update_status(f"Restore error: {e}", is_error=True)
+
+            self._run_in_background(lambda: self._write_hosts_atomic('\n'.join(approved_lines)), restored, restore_failed)
+
+        def show_preview(result):
+            if result is None:
+                self.update_status("Backup is identical to the current hosts file.")
+                messagebox.showinfo("Revert to Backup", "The backup is identical to the current hosts file.")
+                return
+            current_lines, backup_lines = result
+            PreviewWindow(self, current_lines, backup_lines, title="Preview: Restore from Backup", on_apply_callback=do_restore)
+
+        self._run_in_background(read_both, show_preview, read_failed)
 
     # ----------------------------- Imports ------------------------------------
     def fetch_and_append_hosts(self, source_name, url=None, lines_to_add=None):
         self.update_status(f"Importing from {source_name}...")
-        self.root.update_idletasks()
-        try:
-            if url:
-                req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                with urllib.request.urlopen(req) as response:
-                    new_lines = response.read().decode('utf-8', errors='ignore').splitlines()
-            elif lines_to_add:
-                new_lines = lines_to_add
-            else:
-                raise ValueError("Either url or lines_to_add must be provided.")
+        if url:
+            # Download on the network pool so several lists can be fetched at once;
+            # the editor is only touched back on the Tk thread
+            self._run_in_background(lambda: _parse_block(_cached_fetch(url)),
+                                    lambda new_lines: self._append_import(source_name, new_lines),
+                                    lambda e: self._report_import_error(source_name, e),
+                                    pool=self._net_pool)
+        else:
+            self._append_import(source_name, lines_to_add or [])
 
-            if not new_lines:
-                self.update_status(f"No content from {source_name}.", is_error=True)
-                return
+    def _report_import_error(self, source_name, e):
+        self.update_status(f"Import failed: {e}", is_error=True)
+        messagebox.showerror("Import Error", f"Failed to import from {source_name}:\n{e}")
 
-            current_lines = self.get_lines()
-            if current_lines and current_lines[-1].strip() != "":
-                current_lines.append("")
-            current_lines.append(f"# --- Imported from {source_name} ---")
-            current_lines.extend(new_lines)
-            self.set_text(current_lines)
+    def _append_import(self, source_name, new_lines):
+        if not new_lines:
+            self.update_status(f"No content from {source_name}.", is_error=True)
+            return
 
-            num_removed = self.run_auto_whitelist_filter()
-            self.update_status(f"Imported from {source_name}. Removed {num_removed} entries via whitelist.")
-            messagebox.showinfo("Import Successful", f"Added content from {source_name}.\n{num_removed} whitelisted entries removed.")
-        except Exception as e:
-            self.update_status(f"Import failed: {e}", is_error=True)
-            messagebox.showerror("Import Error", f"Failed to import from {source_name}:\n{e}")
+        # Snapshot on the Tk thread; the set building, dedupe and whitelist passes then
+        # run on the worker so a 100k-line import never blocks the window
+        self._sync_lines()
+        existing = list(self._lines)
+        whitelist = self._get_whitelist()
+
+        def work():
+            # Dedupe the block (a no-op for downloads, which _parse_block already
+            # deduped) and drop lines the editor already has, so exact duplicates
+            # never reach the widget
+            existing_set = set(existing)
+            unique_lines = [line for line in dict.fromkeys(new_lines) if not line or line not in existing_set]
+            if not any(unique_lines):
+                return None
+            kept = _filter_whitelisted(unique_lines, *whitelist)
+            # The existing buffer only needs a pass on the Tk side if the whitelist
+            # has changed since it was last filtered
+            existing_dirty = len(_filter_whitelisted(existing, *whitelist)) != len(existing)
+            return kept, len(unique_lines) - len(kept), existing_dirty
+
+        def filtered(result):
+            try:
+                if result is None:
+                    self.update_status(f"Nothing new from {source_name}; all entries already present.")
+                    return
+                kept, num_removed, existing_dirty = result
+                block = []
+                if self._lines and self._lines[-1].strip() != "":
+                    block.append("")
+                block.append(self.IMPORT_HEADER.format(source_name))
+                block.extend(kept)
+                self.append_lines(block)
+
+                if existing_dirty:
+                    num_removed += self.run_auto_whitelist_filter()
+                self.update_status(f"Imported from {source_name}. Removed {num_removed} entries via whitelist.")
+                messagebox.showinfo("Import Successful", f"Added content from {source_name}.\n{num_removed} whitelisted entries removed.")
+            except Exception as e:
+                self._report_import_error(source_name, e)
+
+        self.update_status(f"Filtering entries from {source_name}...")
+        self._run_in_background(work, filtered, lambda e: self._report_import_error(source_name, e))
 
     def import_pfsense_log(self):
         """Import a pfSense DNSBL log file by extracting domains."""
@@ -644,46 +1356,49 @@ class HostsFileEditor:
             return
 
         self.update_status(f"Importing from {os.path.basename(filepath)}...")
-        self.root.update_idletasks()
-
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                log_lines = f.readlines()
 
+        def parse():
             extracted_domains = set()
-            for line in log_lines:
-                parts = line.strip().split(',')
-                if len(parts) > 2 and "DNSBL" in parts[0]:
-                    domain = parts[2].strip()
-                    if domain:
-                        extracted_domains.add(domain)
-
-            if not extracted_domains:
+            add = extracted_domains.add
+            # Logs can be hundreds of MB: stream them, and skip lines without DNSBL before
+            # splitting. Only the first three fields are used and they are never quoted.
+            with open(filepath, 'r', encoding='utf-8', errors='ignore', buffering=1 << 20) as f:
+                for line in f:
+                    if "DNSBL" in line:
+                        row = line.split(',', 3)
+                        if len(row) > 2 and "DNSBL" in row[0]:
+                            add(row[2].strip())
+            extracted_domains.discard('')
+            return sorted(extracted_domains)
+
+        def parsed(new_domains_to_add):
+            if not new_domains_to_add:
                 self.update_status(f"No valid DNSBL domains found in '{os.path.basename(filepath)}'.")
                 messagebox.showinfo("Import Info", "No valid DNSBL domains were found in the selected file.")
                 return
-
-            new_domains_to_add = sorted(list(extracted_domains))
             self.fetch_and_append_hosts(os.path.basename(filepath), lines_to_add=new_domains_to_add)
 
-        except Exception as e:
+        def failed(e):
             self.update_status(f"Error importing log file: {e}", is_error=True)
             messagebox.showerror("Import Error", f"An unexpected error occurred while processing the log file:\n{e}")
 
+        # Large logs are parsed on the worker pool so the window stays responsive
+        self._run_in_background(parse, parsed, failed)
+
     def import_hostshield(self):
-        self.fetch_and_append_hosts("HOSTShield", url="https://raw.githubusercontent.com/SysAdminDoc/HOSTShield/refs/heads/main/HOSTS.txt")
+        self.fetch_and_append_hosts("HOSTShield", url=self.BLOCKLIST_URLS["HOSTShield"])
 
     def import_stevenblack(self):
-        self.fetch_and_append_hosts("StevenBlack", url="https://raw.githubusercontent.com/StevenBlack/hosts/refs/heads/master/hosts")
+        self.fetch_and_append_hosts("StevenBlack", url=self.BLOCKLIST_URLS["StevenBlack"])
 
     def import_hagezi(self):
-        self.fetch_and_append_hosts("HaGezi Ultimate", url="https://cdn.jsdelivr.net/gh/hagezi/dns-blocklists@latest/hosts/ultimate.txt")
+        self.fetch_and_append_hosts("HaGezi Ultimate", url=self.BLOCKLIST_URLS["HaGezi Ultimate"])
 
     def import_adaway(self):
-        self.fetch_and_append_hosts("AdAway", url="https://adaway.org/hosts.txt")
+        self.fetch_and_append_hosts("AdAway", url=self.BLOCKLIST_URLS["AdAway"])
 
     def import_adobe(self):
-        self.fetch_and_append_hosts("Adobe Blocklist", url="https://raw.githubusercontent.com/SysAdminDoc/HOSTShield/refs/heads/main/AdobeHosts.txt")
+        self.fetch_and_append_hosts("Adobe Blocklist", url=self.BLOCKLIST_URLS["Adobe Blocklist"])
 
     def import_ccleaner(self):
         ccleaner_hosts = [
@@ -694,20 +1409,79 @@ class HostsFileEditor:
         self.fetch_and_append_hosts("CCleaner Blocklist", lines_to_add=ccleaner_hosts)
 
     def import_microsoft(self):
-        self.fetch_and_append_hosts("Microsoft Blocklist", url="https://raw.githubusercontent.com/SysAdminDoc/HOSTShield/refs/heads/main/Microsoft.txt")
+        self.fetch_and_append_hosts("Microsoft Blocklist", url=self.BLOCKLIST_URLS["Microsoft Blocklist"])
+
+    def refresh_imported_sources(self):
+        """Re-fetch every downloadable list that has an import header in the editor.
+        All downloads run at once on the network pool, so the wait is the slowest list
+        rather than the sum; the results are merged into a single import block."""
+        urls = dict(self.BLOCKLIST_URLS)
+        urls.update((source['name'], source['url']) for source in self.custom_sources)
+        prefix, suffix = self.IMPORT_HEADER.split('{}')
+        self._sync_lines()
+        names = [line[len(prefix):-len(suffix)] for line in self._lines
+                 if line.startswith(prefix) and line.endswith(suffix)]
+        sources = {name: urls[name] for name in names if name in urls}
+        if not sources:
+            self.update_status("No previously imported web lists found to refresh.", is_error=True)
+            return
+
+        # Each download reports back here on the Tk thread; the merge runs once the
+        # last one is in, walking the sources in editor order
+        outcomes = {}
+
+        def collected(name, outcome):
+            outcomes[name] = outcome
+            if len(outcomes) < len(sources):
+                return
+            fetched, refreshed, failures = [], [], []
+            for name in sources:
+                outcome = outcomes[name]
+                if isinstance(outcome, Exception):
+                    failures.append(f"{name}: {outcome}")
+                else:
+                    fetched.extend(outcome)
+                    refreshed.append(name)
+            if failures:
+                messagebox.showwarning("Refresh Incomplete", "Some lists could not be fetched:\n" + "\n".join(failures))
+            if refreshed:
+                self._append_import(f"refresh of {', '.join(refreshed)}", fetched)
+            else:
+                self.update_status("Refresh failed; no lists could be fetched.", is_error=True)
+
+        self.update_status(f"Refreshing {len(sources)} lists...")
+        for name, url in sources.items():
+            self._run_in_background(lambda u=url: _parse_block(_cached_fetch(u)),
+                                    lambda lines, n=name: collected(n, lines),
+                                    lambda e, n=name: collected(n, e),
+                                    pool=self._net_pool)
 
     # ------------------------- Custom Sources ----------------------------------
     def show_add_source_dialog(self):
         dialog = AddSourceDialog(self.root)
         if dialog.result:
             name, url = dialog.result
-            if any(s['name'] == name for s in self.custom_sources):
+            if name in self._custom_source_names:
                 messagebox.showerror("Error", "Source name already exists.")
                 return
             self.custom_sources.append({'name': name, 'url': url})
-            self._create_custom_source_button(name, url)
+            self._custom_source_names.add(name)
+            # a pending populate pass picks the new source up in order
+            if not self._custom_sources_job:
+                self._populate_custom_sources()
             self.update_status(f"Added custom source: {name}")
 
+    def _populate_custom_sources(self):
+        """Create buttons for custom sources that don't have one yet, a few per idle
+        tick, so a long source list never holds up the first paint of the window."""
+        self._custom_sources_job = None
+        end = min(self._custom_buttons + self.CUSTOM_SOURCE_BATCH, len(self.custom_sources))
+        for source in self.custom_sources[self._custom_buttons:end]:
+            self._create_custom_source_button(source['name'], source['url'])
+        self._custom_buttons = end
+        if end < len(self.custom_sources):
+            self._custom_sources_job = self.root.after_idle(self._populate_custom_sources)
+
     def _create_custom_source_button(self, name, url):
         tooltip = f"Appends the custom '{name}' blocklist."
         btn = self._btn(self.custom_sources_frame, name, lambda u=url, n=name: self.fetch_and_append_hosts(n, url=u), tooltip, style="TButton")
@@ -730,129 +1504,230 @@ class HostsFileEditor:
     def import_whitelist_from_web(self):
         url = "https://raw.githubusercontent.com/SysAdminDoc/HOSTShield/refs/heads/main/Whitelist.txt"
         self.update_status("Importing whitelist...")
-        try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req) as response:
-                content = response.read().decode('utf-8', errors='ignore')
+
+        def fetched(content):
             self.whitelist_text_area.delete('1.0', tk.END)
             self.whitelist_text_area.insert('1.0', content)
             self.update_status("Whitelist imported from HOSTShield.")
-        except Exception as e:
+
+        def failed(e):
             messagebox.showerror("Network Error", f"Could not fetch whitelist:\n{e}")
 
+        # Download and decode off the Tk thread; only the widget update runs here
+        self._run_in_background(lambda: _cached_fetch(url).decode('utf-8', errors='ignore'), fetched, failed,
+                                pool=self._net_pool)
+
+    def _get_whitelist(self):
+        """Return (exact, suffixes) frozensets. A '*.example.com' entry goes into
+        suffixes and allows every subdomain of example.com; anything else must match
+        the hostname exactly. Reused until the whitelist text actually changes."""
+        content = self.whitelist_text_area.get('1.0', tk.END)
+        if content != self._whitelist_cache[0]:
+            exact, suffixes = set(), set()
+            for entry in map(str.strip, content.splitlines()):
+                if not entry or entry[0] == '#':
+                    continue
+                entry = entry.lower()
+                if entry.startswith('*.'):
+                    suffixes.add(entry[2:])
+                else:
+                    exact.add(entry.lstrip('.'))
+            self._whitelist_cache = (content, (frozenset(exact), frozenset(suffixes)))
+        return self._whitelist_cache[1]
+
     def _get_filtered_lines_by_whitelist(self, lines):
-        whitelist_content = self.whitelist_text_area.get('1.0', tk.END)
-        whitelist = {line.strip().lower().lstrip('.') for line in whitelist_content.splitlines() if line.strip()}
-        if not whitelist:
-            return lines
-
-        final_lines = []
-        for line in lines:
-            stripped = line.strip()
-            if not stripped or stripped.startswith('#'):
-                final_lines.append(line)
-                continue
-            parts = stripped.split()
-            if len(parts) < 2 or parts[1].lower() not in whitelist:
-                final_lines.append(line)
-        return final_lines
+        return _filter_whitelisted(lines, *self._get_whitelist())
 
     def run_auto_whitelist_filter(self):
         original = self.get_lines()
         filtered = self._get_filtered_lines_by_whitelist(original)
-        if original != filtered:
+        # The filter only drops lines, so a length check tells whether anything changed
+        num_removed = len(original) - len(filtered)
+        if num_removed:
             self.set_text(filtered)
-        return len(original) - len(filtered)
+        return num_removed
 
     # ------------------------------ Utilities ---------------------------------
     def flush_dns(self):
+        if os.name != 'nt':
+            messagebox.showwarning("Unsupported OS", "Only available on Windows.")
+            return
+        if self._flush_proc is not None:
+            return
         try:
-            if os.name == 'nt':
-                subprocess.run(['ipconfig', '/flushdns'], capture_output=True, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-                messagebox.showinfo("DNS Flushed", "DNS resolver cache flushed.")
-            else:
-                messagebox.showwarning("Unsupported OS", "Only available on Windows.")
+            # ipconfig's few lines of output fit in the pipe buffer, so polling can't stall it
+            self._flush_proc = subprocess.Popen(['ipconfig', '/flushdns'], stdout=subprocess.PIPE,
+                                                stderr=subprocess.STDOUT,
+                                                creationflags=subprocess.CREATE_NO_WINDOW)
         except Exception as e:
             self.update_status(f"Error flushing DNS: {e}", is_error=True)
+            return
+        self.update_status("Flushing DNS resolver cache...")
+        self.root.after(100, self._check_flush)
+
+    def _check_flush(self):
+        returncode = self._flush_proc.poll()
+        if returncode is None:
+            self.root.after(100, self._check_flush)
+            return
+        proc, self._flush_proc = self._flush_proc, None
+        # ipconfig writes in the console's OEM code page, not the locale's ANSI one
+        output = proc.communicate()[0].decode('oem', errors='replace').strip()
+        if returncode == 0:
+            self.update_status("DNS resolver cache flushed.")
+            messagebox.showinfo("DNS Flushed", "DNS resolver cache flushed.")
+        else:
+            self.update_status(f"Error flushing DNS: ipconfig exited with code {returncode}", is_error=True)
+            messagebox.showerror("Flush DNS Failed", output or f"ipconfig exited with code {returncode}")
 
     def process_and_preview(self, processor, title):
+        # The processor runs on the worker pool and must not touch Tk
+        if self._processing:
+            self.update_status("Another operation is still running.")
+            return
         original = self.get_lines()
-        processed = processor(original)
-        if original != processed:
-            PreviewWindow(self, original, processed, title=title)
-        else:
-            self.update_status("No changes to apply.")
+        generation = self._buffer_generation
+
+        def work():
+            # compared here so the Tk thread never walks both lists
+            result = processor(original)
+            return result != original, result
+
+        def processed(outcome):
+            self._processing = False
+            if self._buffer_generation != generation:
+                # the snapshot is stale (typing or an import landed meanwhile); start over
+                self.process_and_preview(processor, title)
+                return
+            changed, result = outcome
+            if changed:
+                self.update_status(f"{title} ready.")
+                PreviewWindow(self, original, result, title=title)
+            else:
+                self.update_status("No changes to apply.")
+
+        def failed(e):
+            self._processing = False
+            self.update_status(f"Error during {title}: {e}", is_error=True)
+
+        self._processing = True
+        self.update_status(f"{title}: processing {len(original):,} lines...")
+        self._run_in_background(work, processed, failed)
 
     def deduplicate(self):
         def processor(lines):
             seen, unique = set(), []
+            seen_add, unique_append = seen.add, unique.append
             for line in lines:
                 stripped = line.strip()
-                if stripped and not stripped.startswith('#'):
-                    lowered = stripped.lower()
-                    if lowered not in seen:
-                        seen.add(lowered)
-                        unique.append(line)
+                if stripped and stripped[0] != '#':
+                    key = stripped.lower()
+                    if key not in seen:
+                        seen_add(key)
+                        unique_append(line)
                 else:
-                    unique.append(line)
+                    unique_append(line)
             return unique
         self.process_and_preview(processor, "Preview: Deduplicate")
 
     def auto_clean(self):
-        self.process_and_preview(self._get_cleaned_lines, "Preview: Clean")
+        # Snapshot the Tk variables here; the worker thread must not read them.
+        sort_entries, group_by_domain = self.sort_entries_var.get(), self.group_by_domain_var.get()
+        self.process_and_preview(lambda lines: list(_clean_lines(tuple(lines), sort_entries, group_by_domain)),
+                                 "Preview: Clean")
 
     def _get_cleaned_lines(self, lines):
-        seen, final_lines = set(), []
-        preserved_lines = [line for line in lines if line.strip().startswith('#') or not line.strip()]
-
-        for line in lines:
-            processed = line.split('#', 1)[0].strip()
-            if not processed:
-                continue
-            parts = processed.split()
-            if not parts:
-                continue
-            hostname = parts[-1].lower()
-            if hostname in ('127.0.0.1', '0.0.0.0', 'localhost'):
-                continue
-            clean_line = f"0.0.0.0 {hostname}"
-            if clean_line not in seen:
-                seen.add(clean_line)
-                final_lines.append(clean_line)
-
-        return sorted(list(set(preserved_lines))) + [""] + sorted(final_lines)
+        return list(_clean_lines(tuple(lines), self.sort_entries_var.get(), self.group_by_domain_var.get()))
 
     # ----------------------------- Search -------------------------------------
     def search_clear(self):
         self.text_area.tag_remove("search_match", "1.0", tk.END)
         self.text_area.tag_remove("search_current", "1.0", tk.END)
-        self._search_matches = []
+        self._search_matches = array('i')
+        self._search_cols = array('i')
         self._search_index = -1
+        self._last_query = ""
         self.update_status("Search cleared.")
 
     def _recompute_search_matches(self, query):
+        self._sync_lines()
+        lines = self._lines
+        last_query = self._last_query
+        source, source_len = self._search_source
+        unchanged = source is lines and source_len == len(lines)
+        if query and query == last_query and unchanged and self._search_matches:
+            # Same query over the same buffer: matches and their tags are still valid
+            self._search_index = 0
+            self._focus_current_match()
+            self.update_status(f"Found {len(self._search_matches)} matches.")
+            return
+        # A line can only match a longer query if it matched its prefix, so while the
+        # buffer is unchanged only lines with a previous hit need rescanning
+        narrow = last_query and query.startswith(last_query) and unchanged
+        previous = self._search_matches
         self.search_clear()
         if not query:
             return
-        start = "1.0"
-        while True:
-            pos = self.text_area.search(query, start, stopindex=tk.END, nocase=True)
-            if not pos:
-                break
-            end = f"{pos}+{len(query)}c"
-            self.text_area.tag_add("search_match", pos, end)
-            self._search_matches.append((pos, end))
-            start = end
+        if narrow:
+            self._search_matches, self._search_cols = self._narrow_match_positions(lines, query, previous)
+        else:
+            self._search_matches, self._search_cols = self._find_match_positions(lines, query)
+        self._last_query = query
+        self._search_source = (lines, len(lines))
+        # A literal matched case-insensitively always spans len(query) characters
+        self._search_len = length = len(query)
+        # Tk's tag add takes many ranges per call; batch them to cut Tcl round-trips.
+        # Index strings only exist per batch, not for the lifetime of the search.
+        batch = self.SEARCH_TAG_BATCH
+        for i in range(0, len(self._search_matches), batch):
+            indices = []
+            for line, col in zip(self._search_matches[i:i + batch], self._search_cols[i:i + batch]):
+                indices.append(f"{line}.{col}")
+                indices.append(f"{line}.{col + length}")
+            self.text_area.tag_add("search_match", *indices)
         if self._search_matches:
             self._search_index = 0
             self._focus_current_match()
             self.update_status(f"Found {len(self._search_matches)} matches.")
 
+    @staticmethod
+    def _find_match_positions(lines, query):
+        """Return (line_numbers, columns) arrays with the start of every
+        case-insensitive match of query. One finditer runs over the joined buffer;
+        line numbers come from counting the newlines between consecutive matches."""
+        text = '\n'.join(lines)
+        pattern = _search_pattern(query)
+        line_numbers, columns = array('i'), array('i')
+        lineno, line_start, last = 1, 0, 0
+        for start in map(re.Match.start, pattern.finditer(text)):
+            newlines = text.count('\n', last, start)
+            if newlines:
+                lineno += newlines
+                line_start = text.rfind('\n', last, start) + 1
+            last = start
+            line_numbers.append(lineno)
+            columns.append(start - line_start)
+        return line_numbers, columns
+
+    @staticmethod
+    def _narrow_match_positions(lines, query, line_numbers):
+        """Like _find_match_positions, but only scans the given line numbers.
+        Whole lines are rescanned rather than single starts because a match of the
+        longer query can begin inside a prefix match that finditer stepped over."""
+        finditer = _search_pattern(query).finditer
+        kept_lines, kept_cols = array('i'), array('i')
+        for lineno in dict.fromkeys(line_numbers):
+            for m in finditer(lines[lineno - 1]):
+                kept_lines.append(lineno)
+                kept_cols.append(m.start())
+        return kept_lines, kept_cols
+
     def _focus_current_match(self):
         self.text_area.tag_remove("search_current", "1.0", tk.END)
         if 0 <= self._search_index < len(self._search_matches):
-            pos, end = self._search_matches[self._search_index]
-            self.text_area.tag_add("search_current", pos, end)
+            line, col = self._search_matches[self._search_index], self._search_cols[self._search_index]
+            pos = f"{line}.{col}"
+            self.text_area.tag_add("search_current", pos, f"{line}.{col + self._search_len}")
             self.text_area.see(pos)
 
     def search_find(self):